@@ -41,6 +41,16 @@ class TemperatureSensorPlugin(ABC):
         """
         pass
     
+    def start_conversion(self):
+        """
+        Kick off a measurement without waiting for the result.
+
+        Sensors whose hardware needs conversion time (e.g. DS18B20) can
+        override this so the wait overlaps with other sensor reads; the
+        default is a no-op for sensors that read instantly.
+        """
+        pass
+
     @abstractmethod
     def get_sensor_info(self):
         """
@@ -70,9 +80,10 @@ class TemperatureSensorPlugin(ABC):
 # Export the base class and available plugins
 __all__ = ['TemperatureSensorPlugin']
 
-# Plugin registry for dynamic loading
+# Plugin registry for dynamic loading: plugin name -> (module, class).
+# Modules are only imported when a configured sensor actually needs them.
 AVAILABLE_PLUGINS = {
-    'ds18b20': 'ds18b20.DS18B20Plugin',
-    'dht11': 'dht.DHTPlugin',
-    'dht22': 'dht.DHTPlugin',
+    'ds18b20': ('ds18b20', 'DS18B20Plugin'),
+    'dht11': ('dht', 'DHTPlugin'),
+    'dht22': ('dht', 'DHTPlugin'),
 }
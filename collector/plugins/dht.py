@@ -3,85 +3,100 @@ DHT11/DHT22 Temperature and Humidity Sensor Plugin
 Digital temperature and humidity sensor plugin for the monitoring system.
 """
 
-import subprocess
+import importlib
 import time
 from . import TemperatureSensorPlugin
 
 class DHTPlugin(TemperatureSensorPlugin):
     """Plugin for DHT11/DHT22 temperature and humidity sensors."""
-    
+
     def __init__(self, name, config):
         super().__init__(name, config)
         self.sensor_type = config.get('sensor_type', 'DHT22')  # DHT11 or DHT22
         self.gpio_pin = config.get('gpio_pin')
         self.last_reading_time = 0
         self.min_interval = 2  # Minimum seconds between readings
-    
+        self._dht_mod = None       # Cached Adafruit_DHT module reference
+        self._sensor_const = None  # Pre-resolved sensor type constant
+        self._avail = None         # Cached availability check result
+        self._last_temp = None     # Most recent successful reading
+
     def is_available(self):
-        """Check if DHT sensor is available."""
+        """Check if DHT sensor is available (result is cached after first call)."""
+        if self._avail is not None:
+            return self._avail
+
         if not self.validate_config(['gpio_pin']):
+            self._avail = False
             return False
-        
+
         # Check if we have a method to read DHT sensors
         # This could be via Adafruit library, pigpio, or other methods
         try:
-            # Try to import a DHT library (this is an example - actual implementation
-            # would depend on which DHT library is installed)
-            import Adafruit_DHT
+            # Import the DHT library once and keep the module reference so
+            # subsequent reads don't pay the import lookup again
+            self._dht_mod = importlib.import_module('Adafruit_DHT')
+            sensor_map = {
+                'DHT11': self._dht_mod.DHT11,
+                'DHT22': self._dht_mod.DHT22,
+                'AM2302': self._dht_mod.AM2302
+            }
+            self._sensor_const = sensor_map.get(self.sensor_type, self._dht_mod.DHT22)
+            self._avail = True
             return True
         except ImportError:
             self.logger.debug("Adafruit_DHT library not available")
-            
+
         # Alternative: check if pigpio daemon is running for bit-banging DHT
         try:
             import pigpio
             pi = pigpio.pi()
             if pi.connected:
                 pi.stop()
+                self._avail = True
                 return True
         except ImportError:
             pass
-        
+
         self.logger.debug("No DHT reading method available")
+        self._avail = False
         return False
     
     def read_temperature(self):
         """Read temperature from DHT sensor."""
-        if not self.is_available():
-            return None
-        
-        # Respect minimum interval between readings
+        # Respect minimum interval between readings before doing any
+        # availability probing — the sensor can't update faster anyway,
+        # so serve the cached value instead of touching the hardware
         current_time = time.time()
         if current_time - self.last_reading_time < self.min_interval:
-            self.logger.debug("Too soon since last reading, skipping")
+            self.logger.debug("Too soon since last reading, returning cached value")
+            return self._last_temp
+
+        if not self.is_available():
             return None
-        
+
         try:
-            # Try Adafruit_DHT library first
-            try:
-                import Adafruit_DHT
-                
-                sensor_map = {
-                    'DHT11': Adafruit_DHT.DHT11,
-                    'DHT22': Adafruit_DHT.DHT22,
-                    'AM2302': Adafruit_DHT.AM2302
-                }
-                
-                sensor = sensor_map.get(self.sensor_type, Adafruit_DHT.DHT22)
-                humidity, temperature = Adafruit_DHT.read_retry(sensor, self.gpio_pin)
-                
+            # Try the cached Adafruit_DHT module first
+            if self._dht_mod is not None:
+                # Single reads with a small explicit retry budget; read_retry
+                # can sleep for 1-2s internally before giving up
+                temperature = None
+                for attempt in range(3):
+                    humidity, temperature = self._dht_mod.read(self._sensor_const, self.gpio_pin)
+                    if temperature is not None:
+                        break
+                    time.sleep(0.25)
+
                 if temperature is not None:
                     self.last_reading_time = current_time
-                    
+
                     # Sanity check for reasonable temperature range
                     if -40 <= temperature <= 80:  # DHT22 operating range
-                        return round(temperature, 2)
+                        self._last_temp = round(temperature, 2)
+                        return self._last_temp
                     else:
                         self.logger.warning(f"Temperature reading out of range: {temperature}°C")
-                
-            except ImportError:
-                self.logger.debug("Adafruit_DHT not available, trying alternative methods")
-                
+
             # Alternative method using pigpio (bit-banging)
             try:
                 import pigpio
@@ -97,34 +112,14 @@ class DHTPlugin(TemperatureSensorPlugin):
                         temperature = dht.temperature()
                         pi.stop()
                         self.last_reading_time = current_time
-                        return round(temperature, 2)
+                        self._last_temp = round(temperature, 2)
+                        return self._last_temp
                     
                     pi.stop()
                     
             except ImportError:
                 pass
-            
-            # Fallback: try external DHT reading utility
-            try:
-                cmd = ['python3', '-c', f'''
-import Adafruit_DHT
-sensor = Adafruit_DHT.DHT22
-pin = {self.gpio_pin}
-humidity, temperature = Adafruit_DHT.read_retry(sensor, pin)
-if temperature is not None:
-    print(temperature)
-else:
-    exit(1)
-''']
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    temperature = float(result.stdout.strip())
-                    self.last_reading_time = current_time
-                    return round(temperature, 2)
-                    
-            except (subprocess.TimeoutExpired, subprocess.CalledProcessError, ValueError):
-                pass
-                
+
         except Exception as e:
             self.logger.error(f"Error reading DHT temperature: {e}")
         
@@ -5,15 +5,22 @@ DS18B20 Temperature Sensor Plugin
 
 import os
 import glob
+import time
 from . import TemperatureSensorPlugin
 
 class DS18B20Plugin(TemperatureSensorPlugin):
     """Plugin for DS18B20 1-Wire temperature sensors."""
-    
+
+    # Worst-case conversion time at 12-bit resolution is 750ms
+    CONVERSION_TIME = 0.8
+
     def __init__(self, name, config):
         super().__init__(name, config)
         self.base_dir = '/sys/bus/w1/devices/'
+        self.bulk_read_file = os.path.join(self.base_dir, 'w1_bus_master1', 'therm_bulk_read')
         self.device_file = None
+        self._last_temp = None
+        self._conversion_started_at = None
         self._find_device()
     
     def _find_device(self):
@@ -46,27 +53,51 @@ class DS18B20Plugin(TemperatureSensorPlugin):
         
         return True
     
+    def start_conversion(self):
+        """Trigger a bulk conversion so the ~750ms wait overlaps other work."""
+        if not self.is_available():
+            return
+
+        try:
+            with open(self.bulk_read_file, 'w') as f:
+                f.write('1')
+            self._conversion_started_at = time.monotonic()
+        except OSError:
+            # Kernel driver without therm_bulk_read support; fall back to
+            # the blocking read inside read_temperature
+            self._conversion_started_at = None
+
     def read_temperature(self):
         """Read temperature from DS18B20 sensor."""
         if not self.is_available():
             return None
-        
+
+        # If a conversion is in flight, sleep out whatever is left of the
+        # window before reading. The collector kicks the conversion off at
+        # the start of the cycle, so the CPU/GPU/SSD reads have usually
+        # absorbed the wait already and the sleep here is near zero.
+        if self._conversion_started_at is not None:
+            remaining = self.CONVERSION_TIME - (time.monotonic()
+                                                - self._conversion_started_at)
+            if remaining > 0:
+                time.sleep(remaining)
+            self._conversion_started_at = None
+
         try:
-            with open(self.device_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Check if reading is valid (ends with YES)
-            if len(lines) >= 2 and lines[0].strip().endswith('YES'):
-                # Extract temperature from second line
-                temp_line = lines[1]
-                equals_pos = temp_line.find('t=')
-                if equals_pos != -1:
-                    temp_string = temp_line[equals_pos + 2:]
-                    temp_c = float(temp_string) / 1000.0
-                    
+            with open(self.device_file, 'rb') as f:
+                data = f.read()
+
+            # First line ends with YES when the CRC check passed
+            if data[:data.find(b'\n')].endswith(b'YES'):
+                # Temperature follows the last 't=' in the output
+                _, sep, raw_temp = data.rpartition(b't=')
+                if sep:
+                    temp_c = int(raw_temp) / 1000.0
+
                     # Sanity check for reasonable temperature range
                     if -55 <= temp_c <= 125:  # DS18B20 operating range
-                        return round(temp_c, 2)
+                        self._last_temp = round(temp_c, 2)
+                        return self._last_temp
                     else:
                         self.logger.warning(f"Temperature reading out of range: {temp_c}°C")
             else:
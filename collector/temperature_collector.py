@@ -4,21 +4,37 @@ Temperature data collector for Raspberry Pi monitoring system.
 """
 
 import json
+import re
 import sqlite3
 import subprocess
 import time
 import os
 import glob
 import importlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import logging
 
+# NVME temperature object in smartctl JSON: "temperature": {"current": 36, ...}
+_SMART_TEMP_RE = re.compile(r'"temperature"\s*:\s*\{[^}]*"current"\s*:\s*(\d+)')
+
 class TemperatureCollector:
+    # Bump when tables or indexes change so setup_database re-runs the DDL
+    SCHEMA_VERSION = 1
+
     def __init__(self, config_path="config/config.json"):
         self.config = self.load_config(config_path)
         self.db_path = self.config["storage"]["database_file"]
         self.external_sensors = {}
+        self._cpu_fd = None
+        self._cycle = 0
+        # Device model names never change for the life of a disk; cache
+        # them across cycles (a collector restart refreshes after a swap)
+        self._name_cache = {}
+        # Shared pool for fanning out the independent sensor groups; each
+        # group mostly blocks on file or subprocess I/O
+        self._pool = ThreadPoolExecutor(max_workers=4)
         self.setup_database()
         self.setup_logging()
         self.load_external_sensors()
@@ -48,11 +64,28 @@ class TemperatureCollector:
     
     def setup_database(self):
         """Create database and tables if they don't exist."""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
+        db_dir = os.path.dirname(self.db_path)
+        if not os.path.isdir(db_dir):
+            os.makedirs(db_dir)
+
+        # Keep one long-lived connection; re-opening the database every
+        # cycle pays file-open and journal-setup cost on each collection.
         conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        # Reclaim freed pages in small steps during cleanup instead of
+        # needing a full (blocking) VACUUM; takes effect on new databases
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+
+        # Schema creation is one-shot; skip the CREATE TABLE/INDEX round
+        # trips entirely when the database is already at the current version
+        user_version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if user_version >= self.SCHEMA_VERSION:
+            self.conn = conn
+            return
+
         cursor = conn.cursor()
-        
+
         # Main temperature readings table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS temperature_readings (
@@ -91,16 +124,36 @@ class TemperatureCollector:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_external_timestamp ON external_temperatures(timestamp)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_storage_device ON storage_temperatures(device_path)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_external_sensor ON external_temperatures(sensor_name)')
-        
+        cursor.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+
         conn.commit()
-        conn.close()
-    
+        self.conn = conn
+
+    def close(self):
+        """Shut down the worker pool and close held resources."""
+        self._pool.shutdown()
+        if self._cpu_fd is not None:
+            os.close(self._cpu_fd)
+            self._cpu_fd = None
+        self.conn.close()
+
+    CPU_TEMP_PATH = '/sys/class/thermal/thermal_zone0/temp'
+
     def get_cpu_temperature(self):
         """Get CPU temperature from /sys/class/thermal/thermal_zone0/temp."""
         try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = float(f.read().strip()) / 1000.0
-                return round(temp, 2)
+            # Keep the sysfs file open across cycles; pread at offset 0
+            # re-reads the current value without a path lookup per cycle
+            if self._cpu_fd is None:
+                self._cpu_fd = os.open(self.CPU_TEMP_PATH, os.O_RDONLY)
+            try:
+                raw = os.pread(self._cpu_fd, 16, 0)
+            except OSError:
+                # Descriptor went stale (e.g. driver reload); re-open once
+                os.close(self._cpu_fd)
+                self._cpu_fd = os.open(self.CPU_TEMP_PATH, os.O_RDONLY)
+                raw = os.pread(self._cpu_fd, 16, 0)
+            return round(int(raw) / 1000.0, 2)
         except Exception as e:
             logging.error(f"Error reading CPU temperature: {e}")
             return None
@@ -108,8 +161,11 @@ class TemperatureCollector:
     def get_gpu_temperature(self):
         """Get GPU temperature using vcgencmd."""
         try:
-            result = subprocess.run(['vcgencmd', 'measure_temp'], 
-                                  capture_output=True, text=True, check=True)
+            # Bounded timeout so a wedged firmware call can't pin a pool
+            # worker for the rest of the cycle
+            result = subprocess.run(['vcgencmd', 'measure_temp'],
+                                  capture_output=True, text=True, check=True,
+                                  timeout=5)
             temp_str = result.stdout.strip()
             # Format: temp=XX.X'C
             temp = float(temp_str.split('=')[1].split("'")[0])
@@ -120,147 +176,146 @@ class TemperatureCollector:
     
     def get_ssd_temperatures(self):
         """Get temperatures from all configured SSD devices with device names."""
-        results = []
-        
         try:
             # Get storage devices from configuration
             devices = self.config["collection"].get("storage_devices", [
                 '/dev/nvme0n1', '/dev/sda', '/dev/sdb', '/dev/mmcblk0'
             ])
-            
-            for device in devices:
-                if os.path.exists(device):
-                    try:
-                        # Get device information first
-                        device_name = self._get_device_name(device)
-                        
-                        # Use sudo to run smartctl for elevated permissions
-                        result = subprocess.run(['sudo', 'smartctl', '-A', device], 
-                                              capture_output=True, text=True, check=True, timeout=10)
-                        lines = result.stdout.split('\n')
-                        
-                        temperature = None
-                        
-                        # Look for temperature in different formats
-                        for line in lines:
-                            # NVME format: Temperature                        XX Celsius
-                            if 'Temperature' in line and ('Celsius' in line or '°C' in line):
-                                parts = line.split()
-                                for i, part in enumerate(parts):
-                                    if part.replace('.', '').isdigit():
-                                        temp = float(part)
-                                        if 20 <= temp <= 100:  # Reasonable temperature range
-                                            temperature = round(temp, 2)
-                                            break
-                                if temperature:
-                                    break
-                            
-                            # Traditional SATA format: Temperature_Celsius
-                            if 'Temperature_Celsius' in line:
-                                parts = line.split()
-                                if len(parts) >= 10 and parts[9].replace('.', '').isdigit():
-                                    temperature = round(float(parts[9]), 2)
-                                    break
-                        
-                        # Try JSON output for NVME devices if no temperature found
-                        if temperature is None:
-                            try:
-                                result_json = subprocess.run(['sudo', 'smartctl', '-A', '-j', device], 
-                                                           capture_output=True, text=True, check=True, timeout=10)
-                                data = json.loads(result_json.stdout)
-                                
-                                # NVME temperature in JSON format
-                                if 'temperature' in data:
-                                    temperature = round(data['temperature']['current'], 2)
-                                
-                                # Check SMART attributes for temperature
-                                elif 'ata_smart_attributes' in data:
-                                    for attr in data['ata_smart_attributes']['table']:
-                                        if attr['name'] == 'Temperature_Celsius':
-                                            temperature = round(attr['raw']['value'], 2)
-                                            break
-                                            
-                            except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError):
-                                # JSON parsing failed, continue without temperature
-                                pass
-                        
-                        if temperature is not None:
-                            results.append({
-                                'device_path': device,
-                                'device_name': device_name,
-                                'temperature': temperature
-                            })
-                            logging.info(f"SSD temperature from {device} ({device_name}): {temperature}°C")
-                        else:
-                            logging.debug(f"No temperature found for {device} ({device_name})")
-                            
-                    except subprocess.TimeoutExpired:
-                        logging.warning(f"Timeout reading temperature from {device}")
-                        continue
-                    except subprocess.CalledProcessError as e:
-                        logging.debug(f"smartctl failed for {device}: {e}")
-                        continue
-                    except Exception as e:
-                        logging.debug(f"Error reading temperature from {device}: {e}")
-                        continue
-            
-            return results
+
+            present = [device for device in devices if os.path.exists(device)]
+            if not present:
+                return []
+
+            # Probe devices in parallel; each probe mostly blocks waiting on
+            # smartctl, so wall time drops from N probes to roughly one
+            with ThreadPoolExecutor(max_workers=min(8, len(present))) as executor:
+                probes = executor.map(self._probe_device, present)
+
+            return self._finalize_probes([probe for probe in probes if probe is not None])
         except Exception as e:
             logging.error(f"Error reading SSD temperatures: {e}")
             return []
-    
-    def _get_device_name(self, device):
-        """Get the device name/model from smartctl."""
+
+    def _finalize_probes(self, probes):
+        """Round and range-check probe temperatures in a single pass."""
+        if len(probes) >= 4:
+            # With several devices, let NumPy do the rounding and masking
+            # in one C-level pass instead of per-element Python ops
+            try:
+                import numpy as np
+                temps = np.round(np.asarray([p['temperature'] for p in probes],
+                                            dtype=np.float64), 2)
+                valid = (temps >= 20) & (temps <= 100)
+                return [dict(probe, temperature=float(temp))
+                        for probe, temp, ok in zip(probes, temps, valid) if ok]
+            except ImportError:
+                pass
+
+        results = []
+        for probe in probes:
+            temperature = round(probe['temperature'], 2)
+            if 20 <= temperature <= 100:  # Reasonable temperature range
+                probe['temperature'] = temperature
+                results.append(probe)
+        return results
+
+    def _probe_device(self, device):
+        """Read the temperature of a single storage device via smartctl."""
         try:
-            result = subprocess.run(['sudo', 'smartctl', '-i', device], 
-                                  capture_output=True, text=True, check=True, timeout=5)
-            lines = result.stdout.split('\n')
-            
-            for line in lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if key in ['Device Model', 'Model Number', 'Product']:
-                        return value
-            
-            # Fallback to device path
-            return device
-            
-        except Exception:
-            return device
+            # Ask smartctl for identity and attributes in one JSON blob;
+            # the structured output covers both NVME and SATA devices in a
+            # single subprocess, without line-by-line text scanning. Once
+            # the model name is cached, -A keeps the output to attributes.
+            flag = '-A' if device in self._name_cache else '-a'
+            result = subprocess.run(['sudo', 'smartctl', flag, '-j', device],
+                                  capture_output=True, text=True, check=True, timeout=10)
+
+            if flag == '-A':
+                # Steady state: the name is cached and only the temperature
+                # is needed, so scan straight for the NVME temperature
+                # object instead of materializing the whole attribute tree.
+                # A miss (e.g. ATA devices) falls through to the full parse.
+                match = _SMART_TEMP_RE.search(result.stdout)
+                if match:
+                    temperature = int(match.group(1))
+                    device_name = self._name_cache[device]
+                    logging.info(f"SSD temperature from {device} ({device_name}): {temperature}°C")
+                    return {
+                        'device_path': device,
+                        'device_name': device_name,
+                        'temperature': temperature
+                    }
+
+            data = json.loads(result.stdout)
+
+            if device not in self._name_cache:
+                self._name_cache[device] = (data.get('model_name')
+                                            or data.get('model_family')
+                                            or device)
+            device_name = self._name_cache[device]
+
+            temperature = None
+
+            # NVME temperature in JSON format; rounding and range checks
+            # happen later in one pass over all probes
+            if 'temperature' in data:
+                temperature = data['temperature']['current']
+
+            # Check SMART attributes for temperature
+            elif 'ata_smart_attributes' in data:
+                for attr in data['ata_smart_attributes']['table']:
+                    if attr['name'] == 'Temperature_Celsius':
+                        temperature = attr['raw']['value']
+                        break
+
+            if temperature is not None:
+                logging.info(f"SSD temperature from {device} ({device_name}): {temperature}°C")
+                return {
+                    'device_path': device,
+                    'device_name': device_name,
+                    'temperature': temperature
+                }
+
+            logging.debug(f"No temperature found for {device} ({device_name})")
+        except subprocess.TimeoutExpired:
+            logging.warning(f"Timeout reading temperature from {device}")
+        except subprocess.CalledProcessError as e:
+            logging.debug(f"smartctl failed for {device}: {e}")
+        except Exception as e:
+            logging.debug(f"Error reading temperature from {device}: {e}")
+
+        return None
     
     def load_external_sensors(self):
         """Load external sensor plugins based on configuration."""
         if not self.config["collection"]["sensors"].get("external_sensors", False):
             return
         
+        from plugins import AVAILABLE_PLUGINS
+
         external_sensors_config = self.config["collection"].get("external_sensors", {})
-        
+
         for sensor_name, sensor_config in external_sensors_config.items():
             try:
+                # Skip disabled sensors before importing anything
+                if not sensor_config.get("enabled", True):
+                    logging.info(f"External sensor {sensor_name} is disabled, skipping")
+                    continue
+
                 plugin_name = sensor_config.get("plugin")
                 if not plugin_name:
                     logging.warning(f"No plugin specified for sensor {sensor_name}")
                     continue
-                
-                # Import the plugin module
-                module_name = f"plugins.{plugin_name}"
-                plugin_module = importlib.import_module(module_name)
-                
-                # Get the plugin class (assumes class name follows convention)
-                class_name = plugin_name.upper() + "Plugin"
-                if hasattr(plugin_module, class_name):
-                    plugin_class = getattr(plugin_module, class_name)
-                elif plugin_name == "dht11" or plugin_name == "dht22":
-                    plugin_class = getattr(plugin_module, "DHTPlugin")
-                elif plugin_name == "ds18b20":
-                    plugin_class = getattr(plugin_module, "DS18B20Plugin")
-                else:
-                    logging.error(f"Unknown plugin class for {plugin_name}")
+
+                if plugin_name not in AVAILABLE_PLUGINS:
+                    logging.error(f"Unknown plugin {plugin_name} for sensor {sensor_name}")
                     continue
-                
+
+                # Import the plugin module only now that we know it's needed
+                module_name, class_name = AVAILABLE_PLUGINS[plugin_name]
+                plugin_module = importlib.import_module(f"plugins.{module_name}")
+                plugin_class = getattr(plugin_module, class_name)
+
                 # Create sensor instance
                 sensor_instance = plugin_class(sensor_name, sensor_config)
                 
@@ -276,26 +331,36 @@ class TemperatureCollector:
     
     def get_external_temperatures(self):
         """Get temperatures from all loaded external sensors."""
-        results = []
-        
-        for sensor_name, sensor_instance in self.external_sensors.items():
-            try:
-                temperature = sensor_instance.read_temperature()
-                if temperature is not None:
-                    sensor_info = sensor_instance.get_sensor_info()
-                    results.append({
-                        'sensor_name': sensor_name,
-                        'sensor_type': sensor_info.get('type', 'Unknown'),
-                        'temperature': temperature
-                    })
-                    logging.info(f"External sensor {sensor_name}: {temperature}°C")
-                else:
-                    logging.debug(f"Failed to read temperature from {sensor_name}")
-            except Exception as e:
-                logging.error(f"Error reading from external sensor {sensor_name}: {e}")
-        
-        return results
-    
+        if not self.external_sensors:
+            return []
+
+        # Sensors are independent (DHT, DS18B20, ...) so read them in
+        # parallel; a slow DHT read no longer delays the other sensors
+        with ThreadPoolExecutor(max_workers=min(8, len(self.external_sensors))) as executor:
+            readings = executor.map(self._read_external_sensor,
+                                    self.external_sensors.items())
+
+        return [reading for reading in readings if reading is not None]
+
+    def _read_external_sensor(self, sensor_item):
+        """Read a single external sensor, returning a result dict or None."""
+        sensor_name, sensor_instance = sensor_item
+        try:
+            temperature = sensor_instance.read_temperature()
+            if temperature is not None:
+                sensor_info = sensor_instance.get_sensor_info()
+                logging.info(f"External sensor {sensor_name}: {temperature}°C")
+                return {
+                    'sensor_name': sensor_name,
+                    'sensor_type': sensor_info.get('type', 'Unknown'),
+                    'temperature': temperature
+                }
+            logging.debug(f"Failed to read temperature from {sensor_name}")
+        except Exception as e:
+            logging.error(f"Error reading from external sensor {sensor_name}: {e}")
+
+        return None
+
     def collect_temperatures(self):
         """Collect all enabled temperature readings."""
         sensors = self.config["collection"]["sensors"]
@@ -304,72 +369,90 @@ class TemperatureCollector:
             'storage': [],
             'external': []
         }
-        
+
+        # Let sensors with conversion delays start measuring now so the
+        # wait overlaps with the CPU/GPU/SSD reads below
+        for sensor_name, sensor_instance in self.external_sensors.items():
+            try:
+                sensor_instance.start_conversion()
+            except Exception as e:
+                logging.debug(f"start_conversion failed for {sensor_name}: {e}")
+
+        # Fan the independent sensor groups out to the shared pool so the
+        # cycle takes as long as the slowest sensor, not the sum of all
+        futures = {}
+
         if sensors["cpu_temp"]:
-            readings['basic']["cpu_temp"] = self.get_cpu_temperature()
-        
+            futures['cpu_temp'] = self._pool.submit(self.get_cpu_temperature)
+
         if sensors["gpu_temp"]:
-            readings['basic']["gpu_temp"] = self.get_gpu_temperature()
-        
+            futures['gpu_temp'] = self._pool.submit(self.get_gpu_temperature)
+
         if sensors["ssd_temp"]:
-            readings['storage'] = self.get_ssd_temperatures()
-        
+            futures['storage'] = self._pool.submit(self.get_ssd_temperatures)
+
         if sensors.get("external_sensors", False):
-            readings['external'] = self.get_external_temperatures()
-        
+            futures['external'] = self._pool.submit(self.get_external_temperatures)
+
+        if 'cpu_temp' in futures:
+            readings['basic']["cpu_temp"] = futures['cpu_temp'].result()
+
+        if 'gpu_temp' in futures:
+            readings['basic']["gpu_temp"] = futures['gpu_temp'].result()
+
+        if 'storage' in futures:
+            readings['storage'] = futures['storage'].result()
+
+        if 'external' in futures:
+            readings['external'] = futures['external'].result()
+
         return readings
     
     def store_readings(self, readings):
         """Store temperature readings in database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         current_time = datetime.now().isoformat()
-        
-        # Store basic readings (CPU, GPU)
+
         basic = readings.get('basic', {})
-        if basic:
-            cursor.execute('''
-                INSERT INTO temperature_readings 
-                (timestamp, cpu_temp, gpu_temp)
-                VALUES (?, ?, ?)
-            ''', (
-                current_time,
-                basic.get("cpu_temp"),
-                basic.get("gpu_temp")
-            ))
-        
-        # Store storage device readings
         storage_readings = readings.get('storage', [])
-        for storage in storage_readings:
-            cursor.execute('''
-                INSERT INTO storage_temperatures 
-                (timestamp, device_path, device_name, temperature)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                current_time,
-                storage['device_path'],
-                storage['device_name'],
-                storage['temperature']
-            ))
-        
-        # Store external sensor readings
         external_readings = readings.get('external', [])
-        for external in external_readings:
-            cursor.execute('''
-                INSERT INTO external_temperatures 
-                (timestamp, sensor_name, sensor_type, temperature)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                current_time,
-                external['sensor_name'],
-                external['sensor_type'],
-                external['temperature']
-            ))
-        
-        conn.commit()
-        conn.close()
-        
+
+        storage_rows = [
+            (current_time, s['device_path'], s['device_name'], s['temperature'])
+            for s in storage_readings
+        ]
+        external_rows = [
+            (current_time, e['sensor_name'], e['sensor_type'], e['temperature'])
+            for e in external_readings
+        ]
+
+        # Batch all inserts into a single transaction so the whole cycle
+        # costs one commit (one fsync) instead of one per row
+        with self.conn:
+            if basic:
+                self.conn.execute('''
+                    INSERT INTO temperature_readings
+                    (timestamp, cpu_temp, gpu_temp)
+                    VALUES (?, ?, ?)
+                ''', (
+                    current_time,
+                    basic.get("cpu_temp"),
+                    basic.get("gpu_temp")
+                ))
+
+            if storage_rows:
+                self.conn.executemany('''
+                    INSERT INTO storage_temperatures
+                    (timestamp, device_path, device_name, temperature)
+                    VALUES (?, ?, ?, ?)
+                ''', storage_rows)
+
+            if external_rows:
+                self.conn.executemany('''
+                    INSERT INTO external_temperatures
+                    (timestamp, sensor_name, sensor_type, temperature)
+                    VALUES (?, ?, ?, ?)
+                ''', external_rows)
+
         # Log summary
         summary = []
         if basic:
@@ -384,28 +467,39 @@ class TemperatureCollector:
     def cleanup_old_data(self):
         """Remove old data based on retention policy."""
         retention_days = self.config["storage"]["retention_days"]
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+
+        cursor = self.conn.cursor()
+
         # Clean up all tables
         tables = ['temperature_readings', 'storage_temperatures', 'external_temperatures']
         total_deleted = 0
-        
+
         for table in tables:
-            cursor.execute(f'''
-                DELETE FROM {table} 
-                WHERE timestamp < datetime('now', '-{retention_days} days')
-            ''')
-            deleted_rows = cursor.rowcount
+            deleted_rows = 0
+            # Delete in bounded chunks so the write lock is released
+            # between batches and collection is never stalled for long
+            while True:
+                cursor.execute(f'''
+                    DELETE FROM {table}
+                    WHERE rowid IN (
+                        SELECT rowid FROM {table}
+                        WHERE timestamp < datetime('now', ?)
+                        LIMIT 1000
+                    )
+                ''', (f'-{retention_days} days',))
+                self.conn.commit()
+                if cursor.rowcount <= 0:
+                    break
+                deleted_rows += cursor.rowcount
+
             total_deleted += deleted_rows
             if deleted_rows > 0:
                 logging.info(f"Cleaned up {deleted_rows} old records from {table}")
-        
-        conn.commit()
-        conn.close()
-        
+
         if total_deleted > 0:
+            # Hand freed pages back in the background-friendly incremental
+            # mode rather than a full VACUUM
+            self.conn.execute('PRAGMA incremental_vacuum')
             logging.info(f"Total cleanup: {total_deleted} old temperature records")
     
     def run_collection(self):
@@ -413,24 +507,39 @@ class TemperatureCollector:
         try:
             readings = self.collect_temperatures()
             self.store_readings(readings)
-            
-            # Cleanup old data occasionally (every 100 collections)
-            if int(time.time()) % 6000 == 0:  # Roughly every 100 minutes
+
+            # Cleanup old data every 100 collections
+            self._cycle += 1
+            if self._cycle % 100 == 0:
                 self.cleanup_old_data()
-                
+
         except Exception as e:
             logging.error(f"Error during collection: {e}")
 
 def main():
     """Main function to run the collector."""
     collector = TemperatureCollector()
-    interval_minutes = collector.config["collection"]["interval_minutes"]
-    
-    logging.info(f"Starting temperature collector with {interval_minutes} minute interval")
-    
-    while True:
-        collector.run_collection()
-        time.sleep(interval_minutes * 60)
+    interval_seconds = collector.config["collection"]["interval_minutes"] * 60
+
+    logging.info(f"Starting temperature collector with "
+                 f"{interval_seconds // 60} minute interval")
+
+    try:
+        # Anchor each cycle to a monotonic tick so the sampling period
+        # doesn't drift by the time each collection takes
+        next_run = time.monotonic()
+        while True:
+            collector.run_collection()
+            next_run += interval_seconds
+            sleep_for = next_run - time.monotonic()
+            if sleep_for > 0:
+                time.sleep(sleep_for)
+            else:
+                logging.warning(f"Collection cycle overran its interval "
+                                f"by {-sleep_for:.1f}s")
+                next_run = time.monotonic()
+    finally:
+        collector.close()
 
 if __name__ == "__main__":
     main()
@@ -5,182 +5,157 @@ This script helps identify available storage devices for temperature monitoring.
 """
 
 import os
+import re
 import subprocess
 import json
-import glob
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
-def check_device_exists(device):
-    """Check if a storage device exists."""
-    return os.path.exists(device)
+# NVME text format: "Temperature:                        36 Celsius"
+_NVME_TEMP_RE = re.compile(r'^Temperature.*?(\d+(?:\.\d+)?)\s*(?:Celsius|°C)', re.M)
+# ATA attribute row: raw value is the 10th column after the attribute name
+_ATA_TEMP_RE = re.compile(r'^\s*\d+\s+Temperature_Celsius\s+(?:\S+\s+){7}(\d+(?:\.\d+)?)', re.M)
 
-def test_smartctl_access(device):
-    """Test if smartctl can access the device."""
-    try:
-        # Test with sudo
-        result = subprocess.run(['sudo', 'smartctl', '-i', device], 
-                              capture_output=True, text=True, check=True, timeout=5)
-        return True, "sudo required"
-    except subprocess.CalledProcessError:
+@functools.lru_cache(maxsize=32)
+def _smartctl(device, flags, use_sudo=True):
+    """Run smartctl once per (device, flags) and cache (rc, stdout).
+
+    Identical invocations within one scan hit the cache instead of
+    re-forking smartctl; process-lifetime caching is fine for a CLI run.
+    """
+    cmd = (['sudo'] if use_sudo else []) + ['smartctl', *flags, device]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+    return result.returncode, result.stdout
+
+def query_device(device):
+    """Fetch identity and SMART attributes with a single smartctl call.
+
+    Returns (data, access_msg) where data is the parsed JSON output or
+    None when the device cannot be accessed.
+    """
+    for use_sudo, access_msg in ((True, "sudo required"), (False, "no sudo required")):
         try:
-            # Test without sudo
-            result = subprocess.run(['smartctl', '-i', device], 
-                                  capture_output=True, text=True, check=True, timeout=5)
-            return True, "no sudo required"
-        except subprocess.CalledProcessError:
-            return False, "access denied"
-    except subprocess.TimeoutExpired:
-        return False, "timeout"
-    except Exception as e:
-        return False, f"error: {e}"
+            returncode, stdout = _smartctl(device, ('-i', '-A', '-j'), use_sudo)
+            if returncode == 0:
+                return json.loads(stdout), access_msg
+        except subprocess.TimeoutExpired:
+            return None, "timeout"
+        except Exception as e:
+            return None, f"error: {e}"
 
-def get_device_info(device):
-    """Get basic device information."""
-    try:
-        result = subprocess.run(['sudo', 'smartctl', '-i', device], 
-                              capture_output=True, text=True, check=True, timeout=5)
-        lines = result.stdout.split('\n')
-        
-        info = {}
-        for line in lines:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                if key in ['Device Model', 'Model Number', 'Product', 'Model Family']:
-                    info['model'] = value
-                elif key == 'Serial Number':
-                    info['serial'] = value
-                elif key == 'User Capacity':
-                    info['capacity'] = value
-                elif key in ['Form Factor', 'Rotation Rate']:
-                    info['type'] = value
-        
-        return info
-    except Exception:
-        return {}
+    return None, "access denied"
+
+def extract_temperature(data):
+    """Pull the temperature out of parsed smartctl JSON, or None."""
+    if 'temperature' in data:
+        return data['temperature'].get('current')
+
+    for attr in data.get('ata_smart_attributes', {}).get('table', []):
+        if attr['name'] == 'Temperature_Celsius':
+            return attr['raw']['value']
+
+    return None
 
 def test_temperature_reading(device):
-    """Test if we can read temperature from the device."""
+    """Fallback temperature check via smartctl text output.
+
+    Only used when the JSON probe succeeded but carried no temperature
+    (e.g. very old smartmontools builds with partial JSON support).
+    """
     try:
-        # Try regular smartctl output
-        result = subprocess.run(['sudo', 'smartctl', '-A', device], 
-                              capture_output=True, text=True, check=True, timeout=10)
-        lines = result.stdout.split('\n')
-        
-        temp_found = False
-        temp_value = None
-        
-        for line in lines:
-            if 'Temperature' in line and ('Celsius' in line or '°C' in line):
-                parts = line.split()
-                for part in parts:
-                    if part.replace('.', '').isdigit():
-                        temp_value = float(part)
-                        if 20 <= temp_value <= 100:
-                            temp_found = True
-                            break
-                if temp_found:
-                    break
-            elif 'Temperature_Celsius' in line:
-                parts = line.split()
-                if len(parts) >= 10 and parts[9].replace('.', '').isdigit():
-                    temp_value = float(parts[9])
-                    temp_found = True
-                    break
-        
-        if temp_found:
-            return True, f"{temp_value}°C"
-        
-        # Try JSON output for NVME
-        try:
-            result_json = subprocess.run(['sudo', 'smartctl', '-A', '-j', device], 
-                                       capture_output=True, text=True, check=True, timeout=10)
-            data = json.loads(result_json.stdout)
-            
-            if 'temperature' in data:
-                temp = data['temperature']['current']
-                return True, f"{temp}°C (JSON)"
-            
-            if 'ata_smart_attributes' in data:
-                for attr in data['ata_smart_attributes']['table']:
-                    if attr['name'] == 'Temperature_Celsius':
-                        temp = attr['raw']['value']
-                        return True, f"{temp}°C (JSON)"
-        except:
-            pass
-        
+        returncode, stdout = _smartctl(device, ('-A',))
+        if returncode != 0:
+            return False, "no temperature data found"
+
+        # One C-level regex scan over the whole output instead of a
+        # Python loop over every line and token
+        match = _NVME_TEMP_RE.search(stdout)
+        if match:
+            temp_value = float(match.group(1))
+            if 20 <= temp_value <= 100:
+                return True, f"{temp_value}°C"
+
+        match = _ATA_TEMP_RE.search(stdout)
+        if match:
+            return True, f"{float(match.group(1))}°C"
+
         return False, "no temperature data found"
-        
+
     except subprocess.TimeoutExpired:
         return False, "timeout"
     except Exception as e:
         return False, f"error: {e}"
 
+def probe_device(device):
+    """Run all checks for one device, buffering report lines for ordered output."""
+    lines = [f"📀 Found device: {device}"]
+    works = False
+
+    # One smartctl call per device: identity, access check, and SMART
+    # attributes all come from the same JSON blob
+    data, access_msg = query_device(device)
+
+    if data is not None:
+        model = data.get('model_name') or data.get('model_family')
+        if model:
+            lines.append(f"   Model: {model}")
+        capacity_bytes = data.get('user_capacity', {}).get('bytes')
+        if capacity_bytes:
+            lines.append(f"   Capacity: {capacity_bytes / 1e9:.1f} GB")
+
+        lines.append(f"   Access: {access_msg}")
+
+        temperature = extract_temperature(data)
+        if temperature is None:
+            # Rarely, old smartmontools emit JSON without temperature;
+            # retry with the text format before giving up
+            can_read_temp, temp_msg = test_temperature_reading(device)
+        else:
+            can_read_temp, temp_msg = True, f"{temperature}°C"
+        lines.append(f"   Temperature: {temp_msg}")
+
+        if can_read_temp:
+            works = True
+            lines.append("   ✅ Device ready for temperature monitoring")
+        else:
+            lines.append("   ❌ Cannot read temperature")
+    else:
+        lines.append(f"   Access: {access_msg}")
+        lines.append("   ❌ Cannot access device")
+
+    return device, lines, works
+
 def main():
     """Main function to scan and test storage devices."""
     print("Storage Device Scanner for Raspberry Pi Temperature Monitor")
     print("=" * 60)
     
-    # Common storage device paths
-    common_devices = [
-        '/dev/nvme0n1',
-        '/dev/nvme1n1', 
-        '/dev/sda',
-        '/dev/sdb',
-        '/dev/sdc',
-        '/dev/mmcblk0',
-        '/dev/mmcblk1'
-    ]
-    
-    # Find additional NVME devices
-    nvme_devices = glob.glob('/dev/nvme*n1')
-    for device in nvme_devices:
-        if device not in common_devices:
-            common_devices.append(device)
-    
-    # Find additional SATA devices
-    sata_devices = glob.glob('/dev/sd[a-z]')
-    for device in sata_devices:
-        if device not in common_devices:
-            common_devices.append(device)
-    
-    found_devices = []
+    # One /dev directory read covers NVME, SATA, and SD/eMMC devices —
+    # no seed list, no globs, no list-membership dedup
+    device_pattern = re.compile(r'^(nvme\d+n1|sd[a-z]|mmcblk\d+)$')
+    found_devices = sorted(
+        '/dev/' + entry for entry in os.listdir('/dev')
+        if device_pattern.match(entry)
+    )
     working_devices = []
-    
+
     print("Scanning for storage devices...\n")
-    
-    for device in common_devices:
-        if check_device_exists(device):
-            found_devices.append(device)
-            print(f"📀 Found device: {device}")
-            
-            # Get device info
-            info = get_device_info(device)
-            if info.get('model'):
-                print(f"   Model: {info['model']}")
-            if info.get('capacity'):
-                print(f"   Capacity: {info['capacity']}")
-            
-            # Test smartctl access
-            can_access, access_msg = test_smartctl_access(device)
-            print(f"   Access: {access_msg}")
-            
-            if can_access:
-                # Test temperature reading
-                can_read_temp, temp_msg = test_temperature_reading(device)
-                print(f"   Temperature: {temp_msg}")
-                
-                if can_read_temp:
-                    working_devices.append(device)
-                    print(f"   ✅ Device ready for temperature monitoring")
-                else:
-                    print(f"   ❌ Cannot read temperature")
-            else:
-                print(f"   ❌ Cannot access device")
-            
+
+    if found_devices:
+        # Probe all devices in parallel — each probe is dominated by idle
+        # smartctl subprocess wait, so wall time is max-of-devices rather
+        # than sum-of-devices. Output is buffered per device and printed
+        # in discovery order afterwards to keep the report readable.
+        with ThreadPoolExecutor(max_workers=len(found_devices)) as executor:
+            probes = executor.map(probe_device, found_devices)
+
+        for device, lines, works in probes:
+            for line in lines:
+                print(line)
             print()
-    
+            if works:
+                working_devices.append(device)
+
     if not found_devices:
         print("No storage devices found.")
         return
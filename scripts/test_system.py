@@ -3,12 +3,35 @@
 Test script to verify the temperature monitoring system setup.
 """
 
+import io
 import os
 import sys
 import json
 import subprocess
 import sqlite3
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Import the collector and server modules once at load time; their
+# transitive imports are the expensive part and the test functions only
+# need to instantiate. Failures are captured and reported per test.
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_PROJECT_DIR, 'collector'),
+                os.path.join(_PROJECT_DIR, 'server')]
+
+try:
+    from temperature_collector import TemperatureCollector
+    _collector_import_error = None
+except Exception as e:
+    TemperatureCollector = None
+    _collector_import_error = e
+
+try:
+    from web_server import TemperatureServer
+    _server_import_error = None
+except Exception as e:
+    TemperatureServer = None
+    _server_import_error = e
 
 def test_config():
     """Test configuration file."""
@@ -36,14 +59,26 @@ def test_config():
         print("❌ Config file contains invalid JSON")
         return False
 
+def _read_cpu_temp_milli():
+    """Read the CPU temperature in milli-degC with a single pread.
+
+    sysfs emits an integer, so int() on the raw bytes (it tolerates the
+    trailing newline) avoids building a file object and stripped string
+    per read; division to °C happens at display time.
+    """
+    fd = os.open('/sys/class/thermal/thermal_zone0/temp', os.O_RDONLY)
+    try:
+        return int(os.pread(fd, 16, 0))
+    finally:
+        os.close(fd)
+
 def test_temperature_sensors():
     """Test available temperature sensors."""
     print("\nTesting temperature sensors...")
-    
+
     # Test CPU temperature
     try:
-        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-            temp = float(f.read().strip()) / 1000.0
+        temp = _read_cpu_temp_milli() / 1000.0
         print(f"✅ CPU temperature: {temp:.1f}°C")
     except Exception as e:
         print(f"❌ CPU temperature: {e}")
@@ -76,9 +111,10 @@ def test_temperature_sensors():
         print("⚠️  smartctl not available (install with: sudo apt install smartmontools)")
     
     # Test for 1-wire sensors
-    w1_devices = Path('/sys/bus/w1/devices')
-    if w1_devices.exists():
-        sensors = list(w1_devices.glob('28*'))
+    w1_dir = '/sys/bus/w1/devices'
+    if os.path.isdir(w1_dir):
+        with os.scandir(w1_dir) as entries:
+            sensors = [e.name for e in entries if e.name.startswith('28')]
         if sensors:
             print(f"✅ Found {len(sensors)} DS18B20 sensor(s)")
         else:
@@ -89,11 +125,12 @@ def test_temperature_sensors():
 def test_collector():
     """Test the temperature collector."""
     print("\nTesting temperature collector...")
-    
-    sys.path.insert(0, 'collector')
+
+    if TemperatureCollector is None:
+        print(f"❌ Temperature collector import error: {_collector_import_error}")
+        return False
+
     try:
-        from temperature_collector import TemperatureCollector
-        
         collector = TemperatureCollector()
         print("✅ Temperature collector module loaded")
         
@@ -138,11 +175,12 @@ def test_collector():
 def test_server():
     """Test the web server module."""
     print("\nTesting web server...")
-    
-    sys.path.insert(0, 'server')
+
+    if TemperatureServer is None:
+        print(f"❌ Web server import error: {_server_import_error}")
+        return False
+
     try:
-        from web_server import TemperatureServer
-        
         server = TemperatureServer()
         print("✅ Web server module loaded")
         
@@ -166,23 +204,30 @@ def test_scripts():
     print("\nTesting scripts...")
     
     scripts = [
-        'scripts/start.sh',
-        'scripts/stop.sh',
-        'scripts/status.sh',
-        'scripts/setup_service.sh',
-        'scripts/setup_sudo.sh',
-        'scripts/scan_devices.py',
-        'scripts/clean_data.py'
+        'start.sh',
+        'stop.sh',
+        'status.sh',
+        'setup_service.sh',
+        'setup_sudo.sh',
+        'scan_devices.py',
+        'clean_data.py'
     ]
-    
+
+    # One directory read instead of an exists() + access() stat pair per
+    # file; the entry's mode bits answer both questions
+    wanted = set(scripts)
+    with os.scandir('scripts') as entries:
+        modes = {e.name: e.stat().st_mode for e in entries if e.name in wanted}
+
     all_good = True
     for script in scripts:
-        if os.path.exists(script) and os.access(script, os.X_OK):
-            print(f"✅ {script} is executable")
+        mode = modes.get(script)
+        if mode is not None and mode & 0o111:
+            print(f"✅ scripts/{script} is executable")
         else:
-            print(f"❌ {script} is not executable")
+            print(f"❌ scripts/{script} is not executable")
             all_good = False
-    
+
     return all_good
 
 def test_plugins():
@@ -190,7 +235,6 @@ def test_plugins():
     print("\nTesting plugin system...")
     
     try:
-        sys.path.insert(0, 'collector')
         from plugins import TemperatureSensorPlugin, AVAILABLE_PLUGINS
         
         print("✅ Plugin base class loaded")
@@ -219,39 +263,90 @@ def test_plugins():
         print(f"❌ Plugin system error: {e}")
         return False
 
+class _ThreadLocalOutput:
+    """Route print() into a per-thread buffer during the concurrent phase.
+
+    Lets independent tests run in parallel without interleaving their
+    output; each thread's text is flushed in submission order afterwards.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def attach(self):
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+
+    def write(self, text):
+        getattr(self._local, 'buffer', self._fallback).write(text)
+
+    def flush(self):
+        getattr(self._local, 'buffer', self._fallback).flush()
+
 def main():
     """Run all tests."""
     print("Raspberry Pi Temperature Monitor - System Test")
     print("=" * 50)
-    
+
     # Change to project directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_dir = os.path.dirname(script_dir)
     os.chdir(project_dir)
-    
+
     print(f"Testing in directory: {os.getcwd()}")
-    
-    tests = [
+
+    # These tests don't share state and spend most of their time waiting
+    # on subprocesses and stat() calls, so run them in parallel; the
+    # collector and server tests touch the database and run afterwards
+    independent_tests = [
         test_config,
         test_temperature_sensors,
         test_scripts,
-        test_plugins,
+        test_plugins
+    ]
+    dependent_tests = [
         test_collector,
         test_server
     ]
-    
+    total = len(independent_tests) + len(dependent_tests)
+
+    router = _ThreadLocalOutput(sys.stdout)
+
+    def run_buffered(test):
+        buffer = router.attach()
+        try:
+            result = test()
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed with exception: {e}")
+            result = False
+        return result, buffer.getvalue()
+
+    original_stdout = sys.stdout
+    sys.stdout = router
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(run_buffered, independent_tests))
+    finally:
+        sys.stdout = original_stdout
+
     passed = 0
-    for test in tests:
+    for result, output in results:
+        sys.stdout.write(output)
+        if result:
+            passed += 1
+
+    for test in dependent_tests:
         try:
             if test():
                 passed += 1
         except Exception as e:
             print(f"❌ Test {test.__name__} failed with exception: {e}")
-    
+
     print(f"\n{'=' * 50}")
-    print(f"Test Results: {passed}/{len(tests)} tests passed")
-    
-    if passed == len(tests):
+    print(f"Test Results: {passed}/{total} tests passed")
+
+    if passed == total:
         print("🎉 All tests passed! The system is ready to use.")
         print("\nTo start the monitoring system:")
         print("  ./scripts/start.sh")
@@ -0,0 +1,66 @@
+"""
+Row pivot for the temperature web server.
+
+The /api/data hot loop lives here with concrete type annotations so it
+can be compiled ahead of time (``pip install mypyc && mypyc
+server/pivot.py``), which turns the per-row attribute and dict work into
+C calls — typically 2-4x faster for glue code like this. Nothing else is
+needed to use a compiled build: the import machinery prefers the built
+extension over this source file, and without one the pure-Python version
+runs as-is.
+"""
+
+import itertools
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, cast
+
+# (timestamp, kind, key, temperature, meta); meta carries AVG(gpu_temp)
+# for 'b' rows and the device/sensor label for 's' and 'e' rows
+Row = Tuple[str, str, Optional[str], Optional[float], Union[str, float, None]]
+Series = Dict[str, Any]
+
+
+def pivot_rows(rows: Iterable[Row],
+               timestamps: List[str],
+               cpu: List[Optional[float]],
+               gpu: List[Optional[float]],
+               storage: List[Optional[Series]],
+               external: List[Optional[Series]],
+               device_ids: Dict[str, int],
+               sensor_ids: Dict[str, int]) -> None:
+    """Fill the columnar payload arrays from sorted pivot rows.
+
+    rows are (timestamp, kind, key, temperature, meta) tuples ordered by
+    timestamp, with kind 'b' (basic), 's' (storage), or 'e' (external).
+    Rows arrive sorted, so one linear groupby pass fills the column
+    arrays in order; series that skip a timestamp are padded with None to
+    keep every array index-aligned. device_ids / sensor_ids assign each
+    key a stable slot in the storage / external lists.
+    """
+    for timestamp, group in itertools.groupby(rows, key=itemgetter(0)):
+        idx = len(timestamps)
+        timestamps.append(timestamp)
+        cpu.append(None)
+        gpu.append(None)
+        for _, kind, key, temperature, meta in group:
+            if kind == 'b':
+                cpu[idx] = temperature
+                gpu[idx] = cast(Optional[float], meta)
+                continue
+            if kind == 's':
+                ids, table, label = device_ids, storage, 'name'
+            else:
+                ids, table, label = sensor_ids, external, 'type'
+            sid = ids.setdefault(cast(str, key), len(ids))
+            while len(table) <= sid:
+                table.append(None)
+            series = table[sid]
+            if series is None:
+                series = table[sid] = {label: meta, 'data': [None] * idx}
+            series['data'].append(temperature)
+        for series in storage:
+            if series is not None and len(series['data']) <= idx:
+                series['data'].append(None)
+        for series in external:
+            if series is not None and len(series['data']) <= idx:
+                series['data'].append(None)
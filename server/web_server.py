@@ -3,20 +3,127 @@
 Web server for Raspberry Pi temperature monitoring system.
 """
 
+import gzip
+import hashlib
+import itertools
 import json
 import sqlite3
+import threading
+import time
 import os
 from datetime import datetime, timedelta
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import logging
 
+# The /api/data hot loop; a mypyc-compiled build of the module is picked
+# up automatically when present (see pivot.py)
+from pivot import pivot_rows
+
+# orjson serializes the big /api/data payloads several times faster than
+# stdlib json and returns bytes directly; fall back to compact stdlib
+# json so the server keeps working on an unprovisioned system
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+# Module-level SQL constants: sqlite3 caches prepared statements per
+# connection keyed on the SQL text, so reusing the exact same string
+# objects guarantees every request hits the cache instead of re-parsing
+_SQL_DATA = '''
+    SELECT strftime('%Y-%m-%dT%H:%M:%S', (strftime('%s', timestamp) / ?) * ?, 'unixepoch') AS t,
+           'b' AS kind, NULL AS key, AVG(cpu_temp), AVG(gpu_temp)
+    FROM temperature_readings
+    WHERE timestamp >= ?
+    GROUP BY 1
+    UNION ALL
+    SELECT strftime('%Y-%m-%dT%H:%M:%S', (strftime('%s', timestamp) / ?) * ?, 'unixepoch'),
+           's', device_path, AVG(temperature), device_name
+    FROM storage_temperatures
+    WHERE timestamp >= ?
+    GROUP BY 1, device_path
+    UNION ALL
+    SELECT strftime('%Y-%m-%dT%H:%M:%S', (strftime('%s', timestamp) / ?) * ?, 'unixepoch'),
+           'e', sensor_name, AVG(temperature), sensor_type
+    FROM external_temperatures
+    WHERE timestamp >= ?
+    GROUP BY 1, sensor_name
+    ORDER BY 1
+'''
+
+_SQL_LATEST_BASIC = '''
+    SELECT timestamp, cpu_temp, gpu_temp
+    FROM temperature_readings
+    ORDER BY timestamp DESC
+    LIMIT 1
+'''
+
+# Rows are append-only, so the newest rowid per device IS the newest
+# reading; one grouped pass over idx_storage_device replaces the
+# correlated MAX(timestamp) subquery that scanned the table twice. A
+# device that dropped out keeps its last reading rather than vanishing
+# when it misses the single newest timestamp.
+_SQL_LATEST_STORAGE = '''
+    SELECT device_path, device_name, temperature, timestamp
+    FROM storage_temperatures
+    WHERE rowid IN (
+        SELECT MAX(rowid) FROM storage_temperatures GROUP BY device_path
+    )
+'''
+
+_SQL_LATEST_EXTERNAL = '''
+    SELECT sensor_name, sensor_type, temperature, timestamp
+    FROM external_temperatures
+    WHERE rowid IN (
+        SELECT MAX(rowid) FROM external_temperatures GROUP BY sensor_name
+    )
+'''
+
 class TemperatureServer:
     def __init__(self, config_path="config/config.json"):
         self.config = self.load_config(config_path)
         self.db_path = self.config["storage"]["database_file"]
         self.setup_logging()
-    
+
+        # One long-lived connection shared across requests; re-connecting
+        # per call re-parses the schema and, in the default rollback-journal
+        # mode, makes every read contend with the collector's writes. WAL
+        # lets reads proceed alongside the writer; the lock serializes
+        # cursor use since sqlite3 connections aren't thread-safe.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Bind datetime objects directly; the adapter renders the ISO
+        # string once at bind time, keeping call sites free of isoformat()
+        sqlite3.register_adapter(datetime, lambda d: d.isoformat())
+        for pragma in ('PRAGMA journal_mode=WAL',
+                       'PRAGMA synchronous=NORMAL',
+                       'PRAGMA busy_timeout=5000',
+                       'PRAGMA mmap_size=134217728',
+                       'PRAGMA cache_size=-20000',
+                       'PRAGMA temp_store=MEMORY'):
+            self._conn.execute(pragma)
+
+        # Short-TTL caches of the serialized API payloads. Every open
+        # dashboard tab polls on the same 30s loop, so concurrent tabs
+        # collapse into one query + one serialization per window.
+        self._data_cache = {}      # (hours, max_points) -> (time bucket, bytes)
+        self._latest_cache = None  # (time bucket, bytes)
+
+        # Stable small-integer ids for storage devices and external
+        # sensors, assigned on first sight and reused across requests;
+        # the pivot loop indexes lists by these instead of hashing the
+        # long path/name strings per series per timestamp
+        self._device_id_cache = {}
+        self._sensor_id_cache = {}
+
+        # The sensor config never changes for the server's lifetime, so
+        # serialize and compress the /api/config body once here
+        self.config_bytes = _dumps(self.config["collection"]["sensors"])
+        self.config_gz = gzip.compress(self.config_bytes, compresslevel=6)
+
     def load_config(self, config_path):
         """Load configuration from JSON file."""
         try:
@@ -40,122 +147,120 @@ class TemperatureServer:
             ]
         )
     
-    def get_temperature_data(self, hours=24):
-        """Get temperature data from database for the specified time range."""
+    def get_temperature_data(self, hours=24, max_points=1500):
+        """Get temperature data for the time range as columnar arrays.
+
+        Readings are averaged into time buckets sized so at most about
+        max_points timestamps come back — the chart canvas is under 1500px
+        wide, so finer data only inflates the payload without adding
+        visible detail. The columnar layout (one array per series, indexed
+        by position in 'timestamps', None where a series has no sample)
+        repeats each key and device name once instead of once per row,
+        and maps 1:1 onto Chart.js dataset arrays on the client. Storage
+        and external series live in lists addressed by the server's stable
+        integer ids; 'storage_index' / 'external_index' map the path or
+        sensor name to its slot.
+        """
+        data = {
+            'timestamps': [],
+            'cpu_temp': [],
+            'gpu_temp': [],
+            'storage': [],         # id -> {'name': ..., 'data': [...]} or None
+            'external': [],        # id -> {'type': ..., 'data': [...]} or None
+            'storage_index': {},   # device_path -> id
+            'external_index': {},  # sensor_name -> id
+        }
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             start_time = datetime.now() - timedelta(hours=hours)
-            
-            # Get basic temperature data (CPU, GPU)
-            cursor.execute('''
-                SELECT timestamp, cpu_temp, gpu_temp
-                FROM temperature_readings
-                WHERE timestamp >= ?
-                ORDER BY timestamp ASC
-            ''', (start_time.isoformat(),))
-            
-            basic_rows = cursor.fetchall()
-            
-            # Get storage temperature data
-            cursor.execute('''
-                SELECT timestamp, device_path, device_name, temperature
-                FROM storage_temperatures
-                WHERE timestamp >= ?
-                ORDER BY timestamp ASC
-            ''', (start_time.isoformat(),))
-            
-            storage_rows = cursor.fetchall()
-            
-            # Get external sensor data
-            cursor.execute('''
-                SELECT timestamp, sensor_name, sensor_type, temperature
-                FROM external_temperatures
-                WHERE timestamp >= ?
-                ORDER BY timestamp ASC
-            ''', (start_time.isoformat(),))
-            
-            external_rows = cursor.fetchall()
-            
-            conn.close()
-            
-            # Organize data by timestamp
-            data_by_time = {}
-            
-            # Add basic readings
-            for row in basic_rows:
-                timestamp = row[0]
-                if timestamp not in data_by_time:
-                    data_by_time[timestamp] = {'timestamp': timestamp}
-                data_by_time[timestamp]['cpu_temp'] = row[1]
-                data_by_time[timestamp]['gpu_temp'] = row[2]
-            
-            # Add storage readings
-            for row in storage_rows:
-                timestamp = row[0]
-                if timestamp not in data_by_time:
-                    data_by_time[timestamp] = {'timestamp': timestamp}
-                    
-                device_key = f"storage_{row[1].replace('/', '_')}"  # /dev/nvme0n1 -> storage__dev_nvme0n1
-                data_by_time[timestamp][device_key] = {
-                    'temperature': row[3],
-                    'device_name': row[2],
-                    'device_path': row[1]
-                }
-            
-            # Add external sensor readings
-            for row in external_rows:
-                timestamp = row[0]
-                if timestamp not in data_by_time:
-                    data_by_time[timestamp] = {'timestamp': timestamp}
-                    
-                sensor_key = f"external_{row[1]}"
-                data_by_time[timestamp][sensor_key] = {
-                    'temperature': row[3],
-                    'sensor_type': row[2],
-                    'sensor_name': row[1]
-                }
-            
-            # Convert to list and sort by timestamp
-            result = list(data_by_time.values())
-            result.sort(key=lambda x: x['timestamp'])
-            
-            return result
+            bucket_sec = max(60, hours * 3600 // max_points)
+
+            # One UNION ALL query over all three tables, bucketed and
+            # sorted by SQLite (index-assisted) rather than merged through
+            # a Python dict and re-sorted afterwards. Each row is
+            # (timestamp, kind, key, temperature, meta); for basic rows the
+            # two value columns carry cpu_temp and gpu_temp.
+            storage = data['storage']
+            external = data['external']
+
+            with self._lock:
+                cursor = self._conn.execute(
+                    _SQL_DATA, (bucket_sec, bucket_sec, start_time) * 3)
+
+                # Pull rows in 1000-row batches and pivot them as they
+                # arrive rather than materializing every tuple up front
+                # with fetchall
+                cursor.arraysize = 1000
+                rows = itertools.chain.from_iterable(
+                    iter(cursor.fetchmany, []))
+
+                pivot_rows(rows, data['timestamps'],
+                           data['cpu_temp'], data['gpu_temp'],
+                           storage, external,
+                           self._device_id_cache, self._sensor_id_cache)
+
+            data['storage_index'] = {
+                path: sid for path, sid in self._device_id_cache.items()
+                if sid < len(storage) and storage[sid] is not None
+            }
+            data['external_index'] = {
+                name: sid for name, sid in self._sensor_id_cache.items()
+                if sid < len(external) and external[sid] is not None
+            }
         except Exception as e:
             logging.error(f"Error fetching temperature data: {e}")
-            return []
-    
+
+        return data
+
+    def get_cached_temperature_bytes(self, hours, max_points=1500):
+        """Cached serialized /api/data payload for this bucket, or None.
+
+        Keyed on the query parameters plus the time bucket, so a stale
+        window can never be served for longer than the 10-second width.
+        """
+        cached = self._data_cache.get((hours, max_points))
+        if cached is not None and cached[0] == int(time.monotonic() // 10):
+            return cached[1]
+        return None
+
+    def cache_temperature_bytes(self, hours, max_points, payload):
+        """Store a serialized payload; entries from older buckets are dropped."""
+        bucket = int(time.monotonic() // 10)
+        self._data_cache = {key: entry for key, entry in self._data_cache.items()
+                            if entry[0] == bucket}
+        self._data_cache[(hours, max_points)] = (bucket, payload)
+
+    def get_latest_readings_bytes(self):
+        """Serialized /api/latest payload with a 5-second TTL."""
+        bucket = int(time.monotonic() // 5)
+        if self._latest_cache is None or self._latest_cache[0] != bucket:
+            self._latest_cache = (bucket, _dumps(self.get_latest_readings()))
+        return self._latest_cache[1]
+
     def get_latest_readings(self):
         """Get the latest temperature readings."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             result = {'timestamp': None}
-            
-            # Get latest basic readings
-            cursor.execute('''
-                SELECT timestamp, cpu_temp, gpu_temp
-                FROM temperature_readings
-                ORDER BY timestamp DESC
-                LIMIT 1
-            ''')
-            
-            basic_row = cursor.fetchone()
+
+            with self._lock:
+                cursor = self._conn.cursor()
+
+                # Get latest basic readings
+                cursor.execute(_SQL_LATEST_BASIC)
+                basic_row = cursor.fetchone()
+
+                # Get latest storage readings
+                cursor.execute(_SQL_LATEST_STORAGE)
+                storage_rows = cursor.fetchall()
+
+                # Get latest external sensor readings
+                cursor.execute(_SQL_LATEST_EXTERNAL)
+                external_rows = cursor.fetchall()
+
             if basic_row:
                 result['timestamp'] = basic_row[0]
                 result['cpu_temp'] = basic_row[1]
                 result['gpu_temp'] = basic_row[2]
-            
-            # Get latest storage readings
-            cursor.execute('''
-                SELECT device_path, device_name, temperature, timestamp
-                FROM storage_temperatures
-                WHERE timestamp = (SELECT MAX(timestamp) FROM storage_temperatures)
-            ''')
-            
-            storage_rows = cursor.fetchall()
+
             result['storage_devices'] = []
             for row in storage_rows:
                 result['storage_devices'].append({
@@ -164,15 +269,7 @@ class TemperatureServer:
                     'temperature': row[2],
                     'timestamp': row[3]
                 })
-            
-            # Get latest external sensor readings
-            cursor.execute('''
-                SELECT sensor_name, sensor_type, temperature, timestamp
-                FROM external_temperatures
-                WHERE timestamp = (SELECT MAX(timestamp) FROM external_temperatures)
-            ''')
-            
-            external_rows = cursor.fetchall()
+
             result['external_sensors'] = []
             for row in external_rows:
                 result['external_sensors'].append({
@@ -181,166 +278,308 @@ class TemperatureServer:
                     'temperature': row[2],
                     'timestamp': row[3]
                 })
-            
-            conn.close()
-            
+
             return result if result['timestamp'] else None
         except Exception as e:
             logging.error(f"Error fetching latest readings: {e}")
             return None
 
+# Dashboard stylesheet, split out of the HTML so the browser caches it
+# independently under a far-future immutable policy
+_CSS = b'''\
+body {
+    font-family: Arial, sans-serif;
+    margin: 0;
+    padding: 20px;
+    background-color: #f5f5f5;
+}
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+    background-color: white;
+    padding: 20px;
+    border-radius: 8px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+h1 {
+    text-align: center;
+    color: #333;
+    margin-bottom: 30px;
+}
+.current-temps {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+    gap: 15px;
+    margin-bottom: 30px;
+}
+.temp-card {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    padding: 20px;
+    border-radius: 8px;
+    text-align: center;
+}
+.temp-card h3 {
+    margin: 0 0 10px 0;
+    font-size: 1.1em;
+    line-height: 1.2;
+}
+.temp-card h3 small {
+    font-size: 0.8em;
+    opacity: 0.8;
+    display: block;
+    font-weight: normal;
+}
+.temp-value {
+    font-size: 2em;
+    font-weight: bold;
+    margin: 0;
+}
+.controls {
+    margin-bottom: 20px;
+    text-align: center;
+}
+.time-selector {
+    margin: 0 10px;
+    padding: 8px 15px;
+    border: 1px solid #ddd;
+    border-radius: 4px;
+    background: white;
+    cursor: pointer;
+}
+.time-selector.active {
+    background: #667eea;
+    color: white;
+}
+.chart-container {
+    position: relative;
+    height: 400px;
+    margin-bottom: 20px;
+}
+.last-update {
+    text-align: center;
+    color: #666;
+    font-style: italic;
+}
+.loading {
+    text-align: center;
+    color: #666;
+    margin: 20px 0;
+}
+'''
+
+_CHART_JS_PATH = 'vendor/chart.min.js'
+_CDN_CHART_SRC = 'https://cdn.jsdelivr.net/npm/chart.js'
+
+def _build_static():
+    """Build the in-memory map of static assets served under /static/.
+
+    A vendored Chart.js copy is picked up when present so cached clients
+    never touch the CDN; without one the page keeps the CDN script tag.
+    """
+    assets = {}
+
+    def add(path, body, content_type, fd=None):
+        assets[path] = {
+            'body': body,
+            'gzip': gzip.compress(body, compresslevel=6),
+            'type': content_type,
+            'etag': '"%s"' % hashlib.md5(body).hexdigest(),
+            # Disk-backed assets keep an open descriptor for the server's
+            # lifetime so the plain variant can go out via sendfile
+            'fd': fd,
+        }
+
+    add('/static/app.css', _CSS, 'text/css')
+    if os.path.exists(_CHART_JS_PATH):
+        with open(_CHART_JS_PATH, 'rb') as f:
+            add('/static/chart.min.js', f.read(), 'application/javascript',
+                fd=os.open(_CHART_JS_PATH, os.O_RDONLY))
+    return assets
+
+_STATIC = _build_static()
+_CHART_SRC = ('/static/chart.min.js' if '/static/chart.min.js' in _STATIC
+              else _CDN_CHART_SRC)
+
 class RequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the TCP connection open between requests, so a tab's
+    # periodic /api/latest polls reuse one socket instead of paying a
+    # fresh handshake each time. Every response body here is sent with
+    # Content-Length (304s have none), which keep-alive requires for the
+    # client to find the message boundary.
+    protocol_version = 'HTTP/1.1'
+
+    # Close keep-alive connections after a minute of silence so parked
+    # tabs don't pin worker threads forever; BaseHTTPRequestHandler turns
+    # the socket timeout into close_connection for us
+    timeout = 60
+
     def __init__(self, temperature_server, *args, **kwargs):
         self.temperature_server = temperature_server
         super().__init__(*args, **kwargs)
-    
+
     def do_GET(self):
         """Handle GET requests."""
+        # The concurrency slot is held only while a request is being
+        # handled — never while a keep-alive socket sits idle between
+        # requests — so parked tabs can't starve the server
+        slots = getattr(self.server, '_slots', None)
+        if slots is None:
+            self._dispatch()
+            return
+        with slots:
+            self._dispatch()
+
+    def _dispatch(self):
         parsed_path = urlparse(self.path)
         path = parsed_path.path
         query_params = parse_qs(parsed_path.query)
-        
+
         if path == '/':
             self.serve_main_page()
         elif path == '/api/data':
             hours = int(query_params.get('hours', [24])[0])
-            self.serve_temperature_data(hours)
+            max_points = int(query_params.get('max_points', [1500])[0])
+            self.serve_temperature_data(hours, max_points)
         elif path == '/api/latest':
             self.serve_latest_readings()
         elif path == '/api/config':
             self.serve_config()
+        elif path in _STATIC:
+            self.serve_static(path)
         else:
             self.send_error(404, "Not Found")
     
     def serve_main_page(self):
         """Serve the main HTML page."""
-        html_content = self.generate_html_page()
-        
+        if self.headers.get('If-None-Match') == self._HTML_ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = self._HTML
         self.send_response(200)
         self.send_header('Content-type', 'text/html')
+        if self._accepts_gzip():
+            body = self._HTML_GZ
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', self._HTML_ETAG)
+        self.send_header('Cache-Control', 'public, max-age=3600')
         self.end_headers()
-        self.wfile.write(html_content.encode())
-    
-    def serve_temperature_data(self, hours):
-        """Serve temperature data as JSON."""
-        data = self.temperature_server.get_temperature_data(hours)
-        
+        self.wfile.write(body)
+
+    def serve_static(self, path):
+        """Serve an in-memory static asset with immutable far-future caching."""
+        asset = _STATIC[path]
+        if self.headers.get('If-None-Match') == asset['etag']:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        use_gzip = self._accepts_gzip()
+        body = asset['gzip'] if use_gzip else asset['body']
         self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-type', asset['type'])
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', asset['etag'])
+        self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
-    
-    def serve_latest_readings(self):
-        """Serve latest temperature readings as JSON."""
-        data = self.temperature_server.get_latest_readings()
-        
+
+        # For the big disk-backed assets, hand the payload to the kernel
+        # page-cache-to-socket instead of copying it through user space;
+        # the headers must be flushed out of Python's buffer first
+        if not use_gzip and asset['fd'] is not None:
+            self.wfile.flush()
+            if self._sendfile(asset['fd'], len(body)):
+                return
+        self.wfile.write(body)
+
+    def _sendfile(self, fd, size):
+        """Copy fd to the socket kernel-side; False if nothing was sent."""
+        if not hasattr(os, 'sendfile'):
+            return False
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(self.wfile.fileno(), fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            # A clean failure before any bytes went out can fall back to
+            # the buffered write; a partial body cannot
+            if offset == 0:
+                return False
+        if offset < size:
+            # The body came up short against the advertised Content-Length;
+            # a reused keep-alive connection would misparse the next
+            # response, so force this one closed
+            self.close_connection = True
+        return True
+
+    def _accepts_gzip(self):
+        """Whether the client advertised gzip support."""
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def _send_json(self, payload):
+        """Send a JSON bytes payload, gzipped when the client supports it.
+
+        Compression is skipped below 512 bytes where the header overhead
+        outweighs the savings; level 1 keeps the CPU cost small next to
+        the bytes saved on the wire.
+        """
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        if len(payload) >= 512 and self._accepts_gzip():
+            payload = gzip.compress(payload, compresslevel=1)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
-    
+        self.wfile.write(payload)
+
+    def serve_temperature_data(self, hours, max_points=1500):
+        """Serve temperature data as columnar JSON."""
+        server = self.temperature_server
+        payload = server.get_cached_temperature_bytes(hours, max_points)
+        if payload is None:
+            payload = _dumps(server.get_temperature_data(hours, max_points))
+            server.cache_temperature_bytes(hours, max_points, payload)
+        self._send_json(payload)
+
+    def serve_latest_readings(self):
+        """Serve latest temperature readings as JSON."""
+        self._send_json(self.temperature_server.get_latest_readings_bytes())
+
     def serve_config(self):
-        """Serve sensor configuration as JSON."""
-        config = self.temperature_server.config["collection"]["sensors"]
-        
+        """Serve the sensor configuration pre-serialized at startup."""
+        server = self.temperature_server
+        body = server.config_bytes
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        if len(body) >= 512 and self._accepts_gzip():
+            body = server.config_gz
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(config).encode())
+        self.wfile.write(body)
     
-    def generate_html_page(self):
-        """Generate the main HTML page with embedded JavaScript."""
-        return '''<!DOCTYPE html>
+    # The dashboard page never changes at runtime; encode it to bytes once
+    # at import instead of rebuilding and re-encoding the string on every
+    # request, and hash it so repeat navigations can be answered with a
+    # bodyless 304
+    _HTML = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Raspberry Pi Temperature Monitor</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: white;
-            padding: 20px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        h1 {
-            text-align: center;
-            color: #333;
-            margin-bottom: 30px;
-        }
-        .current-temps {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-bottom: 30px;
-        }
-        .temp-card {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 8px;
-            text-align: center;
-        }
-        .temp-card h3 {
-            margin: 0 0 10px 0;
-            font-size: 1.1em;
-            line-height: 1.2;
-        }
-        .temp-card h3 small {
-            font-size: 0.8em;
-            opacity: 0.8;
-            display: block;
-            font-weight: normal;
-        }
-        .temp-value {
-            font-size: 2em;
-            font-weight: bold;
-            margin: 0;
-        }
-        .controls {
-            margin-bottom: 20px;
-            text-align: center;
-        }
-        .time-selector {
-            margin: 0 10px;
-            padding: 8px 15px;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-            background: white;
-            cursor: pointer;
-        }
-        .time-selector.active {
-            background: #667eea;
-            color: white;
-        }
-        .chart-container {
-            position: relative;
-            height: 400px;
-            margin-bottom: 20px;
-        }
-        .last-update {
-            text-align: center;
-            color: #666;
-            font-style: italic;
-        }
-        .loading {
-            text-align: center;
-            color: #666;
-            margin: 20px 0;
-        }
-    </style>
+    <script src="__CHART_SRC__"></script>
+    <link rel="stylesheet" href="/static/app.css">
 </head>
 <body>
     <div class="container">
@@ -454,7 +693,7 @@ class RequestHandler(BaseHTTPRequestHandler):
         
         async function loadTemperatureData(hours = 24) {
             try {
-                const response = await fetch(`/api/data?hours=${hours}`);
+                const response = await fetch(`/api/data?hours=${hours}&max_points=1500`);
                 const data = await response.json();
                 updateChart(data);
             } catch (error) {
@@ -464,126 +703,104 @@ class RequestHandler(BaseHTTPRequestHandler):
         
         function updateChart(data) {
             const ctx = document.getElementById('temperatureChart').getContext('2d');
-            
-            if (chart) {
-                chart.destroy();
-            }
-            
-            const labels = data.map(d => new Date(d.timestamp).toLocaleTimeString());
+
+            // The payload is columnar: parallel arrays indexed by position
+            // in data.timestamps, so each dataset below is used as-is
+            const labels = data.timestamps.map(t => new Date(t).toLocaleTimeString());
             const datasets = [];
             const colors = ['#ff6384', '#36a2eb', '#ffce56', '#4bc0c0', '#9966ff', '#ff9f40', '#ff6384', '#c9cbcf'];
             let colorIndex = 0;
-            
-            // CPU Temperature
-            if (data.length > 0 && data[0].cpu_temp !== undefined) {
+
+            // key identifies the series across refreshes (device path /
+            // sensor name); label is display-only and may collide when two
+            // devices share a model name
+            function addDataset(key, label, values) {
                 datasets.push({
-                    label: 'CPU Temperature',
-                    data: data.map(d => d.cpu_temp),
-                    borderColor: colors[colorIndex],
-                    backgroundColor: colors[colorIndex] + '20',
+                    key: key,
+                    label: label,
+                    data: values,
+                    borderColor: colors[colorIndex % colors.length],
+                    backgroundColor: colors[colorIndex % colors.length] + '20',
                     fill: false,
                     tension: 0.1
                 });
                 colorIndex++;
             }
-            
-            // GPU Temperature
-            if (data.length > 0 && data[0].gpu_temp !== undefined) {
-                datasets.push({
-                    label: 'GPU Temperature',
-                    data: data.map(d => d.gpu_temp),
-                    borderColor: colors[colorIndex],
-                    backgroundColor: colors[colorIndex] + '20',
-                    fill: false,
-                    tension: 0.1
-                });
-                colorIndex++;
+
+            // CPU / GPU temperatures: whether these series exist comes
+            // from the sensor config loaded at startup, not from scanning
+            // every point in the arrays
+            if (config.cpu_temp !== false) {
+                addDataset('cpu', 'CPU Temperature', data.cpu_temp);
             }
-            
-            // Storage devices
-            const storageDevices = new Set();
-            data.forEach(d => {
-                Object.keys(d).forEach(key => {
-                    if (key.startsWith('storage_')) {
-                        storageDevices.add(key);
-                    }
-                });
-            });
-            
-            storageDevices.forEach(deviceKey => {
-                const sampleDevice = data.find(d => d[deviceKey])
-                if (sampleDevice && sampleDevice[deviceKey]) {
-                    const deviceName = sampleDevice[deviceKey].device_name || deviceKey;
-                    datasets.push({
-                        label: deviceName,
-                        data: data.map(d => d[deviceKey] ? d[deviceKey].temperature : null),
-                        borderColor: colors[colorIndex % colors.length],
-                        backgroundColor: colors[colorIndex % colors.length] + '20',
-                        fill: false,
-                        tension: 0.1
-                    });
-                    colorIndex++;
-                }
-            });
-            
-            // External sensors
-            const externalSensors = new Set();
-            data.forEach(d => {
-                Object.keys(d).forEach(key => {
-                    if (key.startsWith('external_')) {
-                        externalSensors.add(key);
-                    }
-                });
-            });
-            
-            externalSensors.forEach(sensorKey => {
-                const sampleSensor = data.find(d => d[sensorKey]);
-                if (sampleSensor && sampleSensor[sensorKey]) {
-                    const sensorName = sampleSensor[sensorKey].sensor_name || sensorKey;
-                    datasets.push({
-                        label: sensorName,
-                        data: data.map(d => d[sensorKey] ? d[sensorKey].temperature : null),
-                        borderColor: colors[colorIndex % colors.length],
-                        backgroundColor: colors[colorIndex % colors.length] + '20',
-                        fill: false,
-                        tension: 0.1
-                    });
-                    colorIndex++;
-                }
-            });
-            
-            chart = new Chart(ctx, {
-                type: 'line',
-                data: {
-                    labels: labels,
-                    datasets: datasets
-                },
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    scales: {
-                        y: {
-                            beginAtZero: false,
-                            title: {
-                                display: true,
-                                text: 'Temperature (°C)'
+            if (config.gpu_temp !== false) {
+                addDataset('gpu', 'GPU Temperature', data.gpu_temp);
+            }
+
+            // Storage devices and external sensors: the index objects map
+            // each path/name to its slot in the series lists
+            for (const [devicePath, sid] of Object.entries(data.storage_index)) {
+                const series = data.storage[sid];
+                addDataset('storage:' + devicePath, series.name || devicePath, series.data);
+            }
+
+            for (const [sensorName, sid] of Object.entries(data.external_index)) {
+                addDataset('external:' + sensorName, sensorName, data.external[sid].data);
+            }
+
+            if (!chart) {
+                chart = new Chart(ctx, {
+                    type: 'line',
+                    data: {
+                        labels: labels,
+                        datasets: datasets
+                    },
+                    options: {
+                        responsive: true,
+                        maintainAspectRatio: false,
+                        scales: {
+                            y: {
+                                beginAtZero: false,
+                                title: {
+                                    display: true,
+                                    text: 'Temperature (°C)'
+                                }
+                            },
+                            x: {
+                                title: {
+                                    display: true,
+                                    text: 'Time'
+                                }
                             }
                         },
-                        x: {
-                            title: {
+                        plugins: {
+                            legend: {
                                 display: true,
-                                text: 'Time'
+                                position: 'top'
                             }
                         }
-                    },
-                    plugins: {
-                        legend: {
-                            display: true,
-                            position: 'top'
-                        }
                     }
+                });
+                return;
+            }
+
+            // Reuse the live chart: destroy/recreate tears down the canvas
+            // and all listeners on every refresh. Datasets are reconciled
+            // by their stable key (not the display label, which two devices
+            // of the same model can share) so an unchanged series keeps its
+            // Chart.js state, and update('none') redraws without animating
+            const existing = new Map(chart.data.datasets.map(ds => [ds.key, ds]));
+            chart.data.labels = labels;
+            chart.data.datasets = datasets.map(ds => {
+                const prev = existing.get(ds.key);
+                if (prev) {
+                    prev.data = ds.data;
+                    prev.label = ds.label;
+                    return prev;
                 }
+                return ds;
             });
+            chart.update('none');
         }
         
         function selectTimeRange(hours) {
@@ -610,12 +827,32 @@ class RequestHandler(BaseHTTPRequestHandler):
         init();
     </script>
 </body>
-</html>'''
-    
+</html>'''.replace('__CHART_SRC__', _CHART_SRC).encode('utf-8')
+    _HTML_ETAG = '"%s"' % hashlib.md5(_HTML).hexdigest()
+    # The page is static, so compress it once at the thorough level rather
+    # than per request
+    _HTML_GZ = gzip.compress(_HTML, compresslevel=6)
+
     def log_message(self, format, *args):
         """Override to use our logging configuration."""
         logging.info(f"{self.address_string()} - {format % args}")
 
+class BoundedThreadingHTTPServer(ThreadingHTTPServer):
+    """Threaded server with a cap on in-flight requests.
+
+    One slow /api/data?hours=168 read no longer blocks the quick
+    /api/latest polls from every other tab, while the semaphore keeps a
+    misbehaving client from piling up unbounded work on a small board.
+    The semaphore bounds requests actually being handled, not open
+    connections: the handler acquires a slot per request, so idle
+    keep-alive sockets cost a thread but never a slot.
+    """
+    daemon_threads = True
+
+    def __init__(self, *args, max_concurrency=16, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
 def create_handler(temperature_server):
     """Create a request handler with the temperature server instance."""
     def handler(*args, **kwargs):
@@ -630,7 +867,7 @@ def main():
     port = server.config["server"]["port"]
     
     handler = create_handler(server)
-    httpd = HTTPServer((host, port), handler)
+    httpd = BoundedThreadingHTTPServer((host, port), handler)
     
     logging.info(f"Starting temperature monitoring server on http://{host}:{port}")
     